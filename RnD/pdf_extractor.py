@@ -1,37 +1,78 @@
-import PyPDF2
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pypdfium2 as pdfium
 
 pdf_path = "pdfcoffee.com_joe-dinapoli-trading-with-dinapoli-levels-pdf-free.pdf"
 output_dir = "extracted_text"
+chunk_size = 20  # pages per file
+write_buffer = 1 << 20  # 1 MiB buffers: many small page writes, few syscalls
+
+# Each worker process opens the PDF once and then extracts pages from it.
+# PDFium is not thread-safe, so parallelism stays at the process level.
+_pdf = None
+
+
+def _init_worker(path):
+    global _pdf
+    _pdf = pdfium.PdfDocument(path)
+
+
+def _extract_page(idx):
+    page = _pdf[idx]
+    textpage = page.get_textpage()
+    try:
+        # PDFium ends lines with \r\n; keep the files' \n line endings
+        return textpage.get_text_range().replace("\r\n", "\n")
+    finally:
+        textpage.close()
+        page.close()
 
-# Create output directory
-os.makedirs(output_dir, exist_ok=True)
 
-with open(pdf_path, "rb") as file:
-    reader = PyPDF2.PdfReader(file)
-    total_pages = len(reader.pages)
+if __name__ == "__main__":
+    # Create output directory
+    os.makedirs(output_dir, exist_ok=True)
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    total_pages = len(pdf)
+    pdf.close()
     print(f"Total pages: {total_pages}")
 
-    # Extract text page by page and save in chunks
-    chunk_size = 20  # pages per file
-    all_text = []
-
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text()
-        all_text.append(f"\n\n=== PAGE {i+1} ===\n\n{text}")
-        print(f"Extracted page {i+1}/{total_pages}")
-
-    # Save all text to one file
-    with open(os.path.join(output_dir, "full_text.txt"), "w", encoding="utf-8") as f:
-        f.write("".join(all_text))
-
-    # Also save in chunks for easier reading
-    for chunk_num in range(0, total_pages, chunk_size):
-        chunk_end = min(chunk_num + chunk_size, total_pages)
-        chunk_text = "".join(all_text[chunk_num:chunk_end])
-        filename = f"pages_{chunk_num+1}_to_{chunk_end}.txt"
-        with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
-            f.write(chunk_text)
-        print(f"Saved {filename}")
-
-print(f"\nDone! Text files saved to '{output_dir}' folder")
+    # Text extraction is CPU-bound, so spread pages across processes;
+    # map() yields results back in page order. Each page is written to
+    # full_text.txt and its chunk file as it arrives, so memory stays at
+    # one page instead of the whole book.
+    full_path = os.path.join(output_dir, "full_text.txt")
+    chunk_file = None
+    with open(full_path, "w", encoding="utf-8", buffering=write_buffer) as full_file, ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(pdf_path,)
+    ) as executor:
+        try:
+            pages = executor.map(_extract_page, range(total_pages), chunksize=8)
+            for i, text in enumerate(pages):
+                block = f"\n\n=== PAGE {i+1} ===\n\n{text}"
+                print(f"Extracted page {i+1}/{total_pages}")
+
+                # Roll to the next chunk file every chunk_size pages
+                if i % chunk_size == 0:
+                    if chunk_file:
+                        chunk_file.close()
+                        print(f"Saved {os.path.basename(chunk_file.name)}")
+                    filename = f"pages_{i+1}_to_{min(i + chunk_size, total_pages)}.txt"
+                    chunk_file = open(
+                        os.path.join(output_dir, filename), "w",
+                        encoding="utf-8", buffering=write_buffer
+                    )
+
+                full_file.write(block)
+                chunk_file.write(block)
+        finally:
+            if chunk_file:
+                chunk_file.close()
+
+    if chunk_file:
+        print(f"Saved {os.path.basename(chunk_file.name)}")
+
+    print(f"\nDone! Text files saved to '{output_dir}' folder")
@@ -4,14 +4,21 @@ Test DiNapoli Fibonacci methodology on historical data
 """
 
 import json
+import os
+from bisect import bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+from itertools import accumulate
 
-from schwab_client import SchwabClient, Candle
+import numpy as np
+
+from schwab_client import SchwabClient, CandleSeries, DEFAULT_CACHE_DIR
 from dinapoli import (
     DiNapoliCalculator,
     Fibnode,
+    FibRatio,
     ObjectivePoint,
     Confluence,
     Agreement,
@@ -21,7 +28,7 @@ from dinapoli import (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class LevelTest:
     """Result of testing a single level"""
     level_type: str  # "F3", "F5", "COP", "OP", "XOP", "Confluence", "Agreement"
@@ -35,7 +42,7 @@ class LevelTest:
     max_pierce_pct: float  # How far past the level price went
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestResult:
     """Complete backtest results"""
     symbol: str
@@ -49,6 +56,284 @@ class BacktestResult:
     stats: Dict[str, float]
 
 
+# =============================================================================
+# SWING PROCESSING
+# =============================================================================
+
+# Level type names, indexed by FibRatio
+_FIBNODE_TYPES = tuple(ratio_id.name for ratio_id in FibRatio)
+
+
+def _process_swing(
+    i: int,
+    swing_highs: List[SwingPoint],
+    swing_lows: List[SwingPoint],
+    swing_low_indices: List[int],
+    high_prefix_min: List[float],
+    low_prefix_min: List[float],
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    calc: DiNapoliCalculator,
+    pierce_tolerance_pct: float
+) -> Tuple[List[LevelTest], bool]:
+    """
+    Build and test every level for the market swing ending at swing_highs[i].
+
+    The swing lists must be sorted by index (as find_swing_points returns
+    them); swing_low_indices and the *_prefix_min lists are precomputed from
+    them once per backtest, so the per-swing lookups are O(log N) bisects
+    instead of Python scans. Slicing the swing lists (here and in
+    identify_market_swing) is still O(N), but as C-level copies.
+    Candle data is passed as parallel float64 arrays; test windows are
+    half-open [start, end) index ranges into them.
+
+    Returns:
+        Tuple of (level_tests, counted) where counted is False when the
+        swing had no usable focus/reactions and was skipped
+    """
+    level_tests = []
+
+    # Get swings up to this point
+    current_highs = swing_highs[:i + 1]
+    current_lows = swing_lows[:bisect_right(swing_low_indices, swing_highs[i].index)]
+
+    if len(current_highs) < 2 or len(current_lows) < 1:
+        return [], False
+
+    focus, reactions, is_uptrend = identify_market_swing(current_highs, current_lows)
+
+    if not focus or len(reactions) < 1:
+        return [], False
+
+    # Calculate Fibnodes
+    fibnodes = calc.calculate_fibnode_batch(
+        focus.price,
+        reactions[:5],  # Use up to 5 most recent reactions
+        is_uptrend
+    )
+
+    # Get price range for tolerance calculations. Reactions are a prefix of
+    # the lows (uptrend) or highs (downtrend), so their min is precomputed.
+    prefix_min = low_prefix_min if is_uptrend else high_prefix_min
+    price_range = abs(focus.price - prefix_min[len(reactions) - 1])
+
+    # Find Confluence
+    confluences = calc.find_confluence(fibnodes, price_range)
+
+    # Test Fibnodes and Confluence areas on subsequent price action. They
+    # share one test window, so they are swept together as a single batch.
+    test_start = focus.index + 1
+    test_end = min(test_start + 50, len(closes))  # Test next 50 bars
+    test_window = (highs, lows, closes, test_start, test_end)
+
+    fib_prices = fibnodes.prices
+    sr_prices = fib_prices.tolist()
+    sr_types = [_FIBNODE_TYPES[ratio_id] for ratio_id in fibnodes.ratio_ids.tolist()]
+    for conf in confluences:
+        sr_prices.append((conf.price_low + conf.price_high) / 2)
+        sr_types.append("Confluence")
+
+    level_tests.extend(_test_levels(
+        sr_prices,
+        sr_types,
+        *test_window,
+        is_support=is_uptrend,
+        pierce_tolerance_pct=pierce_tolerance_pct
+    ))
+
+    # Calculate and test Objective Points if we have ABC pattern
+    if len(reactions) >= 1 and test_end > test_start:
+        # Find potential C point (retracement into fibnodes): the first bar
+        # in the next 20 whose range holds a fibnode, earliest fibnode first
+        c_end = min(test_start + 20, test_end)
+        c_touch = (
+            (lows[test_start:c_end, None] <= fib_prices[None, :])
+            & (fib_prices[None, :] <= highs[test_start:c_end, None])
+        )
+        c_candidates = np.flatnonzero(c_touch)
+
+        if len(c_candidates):
+            c_idx, c_fib = divmod(int(c_candidates[0]), len(fib_prices))  # First touch
+            c_price = sr_prices[c_fib]
+
+            ops = calc.calculate_objective_points(
+                reactions[0].price,  # Point A
+                focus.price,  # Point B
+                c_price,  # Point C
+                is_uptrend
+            )
+
+            # Test OPs on remaining candles
+            op_window = (highs, lows, closes, test_start + c_idx, test_end)
+            level_tests.extend(_test_levels(
+                [op.price for op in ops],
+                [op.name for op in ops],
+                *op_window,
+                is_support=False,  # OPs are targets, not S/R
+                pierce_tolerance_pct=pierce_tolerance_pct
+            ))
+
+            # Find and test Agreement
+            agreements = calc.find_agreement(fibnodes, ops, price_range)
+            if agreements:
+                level_tests.extend(_test_levels(
+                    [(agr.price_low + agr.price_high) / 2 for agr in agreements],
+                    ["Agreement"] * len(agreements),
+                    *test_window,
+                    is_support=is_uptrend,
+                    pierce_tolerance_pct=pierce_tolerance_pct
+                ))
+
+    return level_tests, True
+
+
+# Per-process copy of the read-only backtest inputs, set once per worker
+_worker_args = ()
+
+
+def _init_swing_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def _process_swing_in_worker(i: int) -> Tuple[List[LevelTest], bool]:
+    return _process_swing(i, *_worker_args)
+
+
+# Objective points only need price to reach them, not to respect them
+_TARGET_TYPES = ("COP", "OP", "XOP")
+
+# Level sweeps, specialized on (is_support, "sr" | "target") so the hot
+# expressions carry no branches. Each takes the level prices and the
+# window's (bars x 1) high/low/close columns and returns
+# (touch_count, touched, held, pierced, broken, first_mask, max_pierce_pct),
+# one entry per level.
+
+
+def _test_support_sr(prices, high, low, close, pierce_tolerance_pct):
+    # Bars whose range contains each level
+    touched_mask = (low <= prices) & (prices <= high)
+    touch_count = touched_mask.sum(axis=0)
+
+    # For support: price should stay above or bounce from level
+    held = (touched_mask & (close >= prices)).any(axis=0)
+
+    closed_below = touched_mask & (close < prices)
+    pierce_amount = prices - close
+    pierce_threshold = prices * (pierce_tolerance_pct / 100)
+    max_pierce_pct = np.where(
+        closed_below, pierce_amount / prices * 100, 0.0
+    ).max(axis=0, initial=0.0)
+    broken = (closed_below & (pierce_amount > pierce_threshold)).any(axis=0)
+    pierced = (closed_below & (pierce_amount <= pierce_threshold)).any(axis=0)
+
+    return touch_count, touch_count > 0, held, pierced, broken, touched_mask, max_pierce_pct
+
+
+def _test_resistance_sr(prices, high, low, close, pierce_tolerance_pct):
+    touched_mask = (low <= prices) & (prices <= high)
+    touch_count = touched_mask.sum(axis=0)
+    touched = touch_count > 0
+    no_pierce = np.zeros(len(prices), dtype=bool)
+
+    # A touching bar's high has reached the level, so touched == held
+    return touch_count, touched, touched, no_pierce, no_pierce, touched_mask, np.zeros(len(prices))
+
+
+def _test_support_target(prices, high, low, close, pierce_tolerance_pct):
+    touch_count, touched, held, pierced, broken, touched_mask, max_pierce_pct = _test_support_sr(
+        prices, high, low, close, pierce_tolerance_pct
+    )
+
+    # A downside target also counts once any bar trades at or below it
+    reached = low <= prices
+    reached_any = reached.any(axis=0)
+
+    return (
+        touch_count, touched | reached_any, held | reached_any,
+        pierced, broken, touched_mask | reached, max_pierce_pct
+    )
+
+
+def _test_resistance_target(prices, high, low, close, pierce_tolerance_pct):
+    touch_count = ((low <= prices) & (prices <= high)).sum(axis=0)
+
+    # An upside target is hit once any bar trades at or above it; every
+    # bar that touches the level is one of those
+    reached = high >= prices
+    reached_any = reached.any(axis=0)
+    no_pierce = np.zeros(len(prices), dtype=bool)
+
+    return touch_count, reached_any, reached_any, no_pierce, no_pierce, reached, np.zeros(len(prices))
+
+
+_TEST_FUNCS = {
+    (True, "sr"): _test_support_sr,
+    (False, "sr"): _test_resistance_sr,
+    (True, "target"): _test_support_target,
+    (False, "target"): _test_resistance_target,
+}
+
+
+def _test_levels(
+    level_prices: List[float],
+    level_types: List[str],
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    start: int,
+    end: int,
+    is_support: bool,
+    pierce_tolerance_pct: float
+) -> List[LevelTest]:
+    """
+    Test how price respects several levels over the same bars [start, end).
+
+    Every mask is (bars x levels), so the window is swept once for the
+    whole batch instead of once per level. A batch is either all objective
+    points or all S/R levels; the matching sweep is picked once up front.
+    """
+    kind = "target" if level_types[0] in _TARGET_TYPES else "sr"
+    touch_count, touched, held, pierced, broken, first_mask, max_pierce_pct = _TEST_FUNCS[
+        (is_support, kind)
+    ](
+        np.asarray(level_prices, dtype=np.float64),
+        highs[start:end, None],
+        lows[start:end, None],
+        closes[start:end, None],
+        pierce_tolerance_pct
+    )
+
+    first_idx = first_mask.argmax(axis=0) if len(first_mask) else 0
+    first_touch_idx = np.where(first_mask.any(axis=0), first_idx, -1)
+
+    return [
+        LevelTest(
+            level_type=level_type,
+            price=price,
+            touched=t,
+            held=h,
+            pierced=p,
+            broken=b,
+            touch_count=count,
+            first_touch_idx=first if first >= 0 else None,
+            max_pierce_pct=pierce
+        )
+        for level_type, price, t, h, p, b, count, first, pierce in zip(
+            level_types,
+            level_prices,
+            touched.tolist(),
+            held.tolist(),
+            pierced.tolist(),
+            broken.tolist(),
+            touch_count.tolist(),
+            first_touch_idx.tolist(),
+            max_pierce_pct.tolist()
+        )
+    ]
+
+
 class DiNapoliBacktester:
     """Backtest DiNapoli Levels on historical data"""
 
@@ -57,7 +342,9 @@ class DiNapoliBacktester:
         client: SchwabClient,
         swing_lookback: int = 5,
         confluence_tolerance: float = 0.5,
-        pierce_tolerance_pct: float = 0.3
+        pierce_tolerance_pct: float = 0.3,
+        max_workers: int = 1,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR
     ):
         """
         Args:
@@ -65,11 +352,18 @@ class DiNapoliBacktester:
             swing_lookback: Bars to look back/forward for swing detection
             confluence_tolerance: Percentage tolerance for Confluence
             pierce_tolerance_pct: How much a level can be pierced before "broken"
+            max_workers: Processes used for the per-swing loop (1 = run inline,
+                         0 = one per CPU, up to 8). Worth raising for long or
+                         intraday histories; process startup dominates on a
+                         single year of daily bars.
+            cache_dir: Directory for SchwabClient.get_history_cached (None disables it)
         """
         self.client = client
         self.calc = DiNapoliCalculator(confluence_tolerance_pct=confluence_tolerance)
         self.swing_lookback = swing_lookback
         self.pierce_tolerance_pct = pierce_tolerance_pct
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        self.cache_dir = cache_dir
 
     def run_backtest(
         self,
@@ -90,240 +384,129 @@ class DiNapoliBacktester:
         Returns:
             BacktestResult with all level tests and statistics
         """
-        # Fetch historical data
-        candles = self.client.get_history(
-            symbol,
-            period_type=period_type,
-            period=period,
-            frequency_type=frequency_type
-        )
-
-        if not candles:
-            raise ValueError(f"No data returned for {symbol}")
-
-        # Extract price arrays
-        highs = [c.high for c in candles]
-        lows = [c.low for c in candles]
-        closes = [c.close for c in candles]
+        # Fetch historical data (from today's cache when available)
+        history = self._load_history(symbol, period_type, period, frequency_type)
+        timestamps = history.timestamp
+        highs = history.high
+        lows = history.low
+        closes = history.close
 
         # Find swing points
         swing_highs, swing_lows = find_swing_points(highs, lows, self.swing_lookback)
 
-        all_level_tests = []
+        # Process each potential market swing. Iterations are independent,
+        # so they can be fanned out across processes for long histories.
+        swing_args = (
+            swing_highs,
+            swing_lows,
+            [l.index for l in swing_lows],
+            list(accumulate((h.price for h in swing_highs), min)),
+            list(accumulate((l.price for l in swing_lows), min)),
+            highs,
+            lows,
+            closes,
+            self.calc,
+            self.pierce_tolerance_pct
+        )
+        if self.max_workers > 1 and len(swing_highs) > 1:
+            chunksize = max(1, len(swing_highs) // (self.max_workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_swing_worker,
+                initargs=swing_args
+            ) as executor:
+                results = list(executor.map(
+                    _process_swing_in_worker,
+                    range(len(swing_highs)),
+                    chunksize=chunksize
+                ))
+        else:
+            results = [_process_swing(i, *swing_args) for i in range(len(swing_highs))]
+
+        # Every swing's tests are known by now, so size the combined list
+        # exactly once and fill it by slice instead of growing it
+        all_level_tests = [None] * sum(len(level_tests) for level_tests, _ in results)
         swing_count = 0
-
-        # Process each potential market swing
-        for i in range(len(swing_highs)):
-            # Get swings up to this point
-            current_highs = [h for h in swing_highs if h.index <= swing_highs[i].index]
-            current_lows = [l for l in swing_lows if l.index <= swing_highs[i].index]
-
-            if len(current_highs) < 2 or len(current_lows) < 1:
-                continue
-
-            focus, reactions, is_uptrend = identify_market_swing(current_highs, current_lows)
-
-            if not focus or len(reactions) < 1:
-                continue
-
-            swing_count += 1
-
-            # Calculate Fibnodes
-            fibnodes = self.calc.calculate_fibnodes(
-                focus.price,
-                reactions[:5],  # Use up to 5 most recent reactions
-                is_uptrend
-            )
-
-            # Get price range for tolerance calculations
-            price_range = abs(focus.price - min(r.price for r in reactions))
-
-            # Find Confluence
-            confluences = self.calc.find_confluence(fibnodes, price_range)
-
-            # Test Fibnodes on subsequent price action
-            test_start = focus.index + 1
-            test_candles = candles[test_start:test_start + 50]  # Test next 50 bars
-
-            for fn in fibnodes:
-                test = self._test_level(
-                    fn.price,
-                    "F3" if fn.ratio == 0.382 else "F5",
-                    test_candles,
-                    is_support=is_uptrend,
-                    price_range=price_range
-                )
-                all_level_tests.append(test)
-
-            # Test Confluence areas
-            for conf in confluences:
-                mid_price = (conf.price_low + conf.price_high) / 2
-                test = self._test_level(
-                    mid_price,
-                    "Confluence",
-                    test_candles,
-                    is_support=is_uptrend,
-                    price_range=price_range
-                )
-                all_level_tests.append(test)
-
-            # Calculate and test Objective Points if we have ABC pattern
-            if len(reactions) >= 1 and len(test_candles) > 0:
-                # Find potential C point (retracement into fibnodes)
-                c_candidates = []
-                for j, tc in enumerate(test_candles[:20]):
-                    for fn in fibnodes:
-                        if is_uptrend and tc.low <= fn.price <= tc.high:
-                            c_candidates.append((j, fn.price))
-                        elif not is_uptrend and tc.low <= fn.price <= tc.high:
-                            c_candidates.append((j, fn.price))
-
-                if c_candidates:
-                    c_idx, c_price = c_candidates[0]  # First touch
-
-                    ops = self.calc.calculate_objective_points(
-                        reactions[0].price,  # Point A
-                        focus.price,  # Point B
-                        c_price,  # Point C
-                        is_uptrend
-                    )
-
-                    # Test OPs on remaining candles
-                    op_test_candles = test_candles[c_idx:]
-                    for op in ops:
-                        test = self._test_level(
-                            op.price,
-                            op.name,
-                            op_test_candles,
-                            is_support=False,  # OPs are targets, not S/R
-                            price_range=price_range
-                        )
-                        all_level_tests.append(test)
-
-                    # Find and test Agreement
-                    agreements = self.calc.find_agreement(fibnodes, ops, price_range)
-                    for agr in agreements:
-                        mid_price = (agr.price_low + agr.price_high) / 2
-                        test = self._test_level(
-                            mid_price,
-                            "Agreement",
-                            test_candles,
-                            is_support=is_uptrend,
-                            price_range=price_range
-                        )
-                        all_level_tests.append(test)
+        pos = 0
+        for level_tests, counted in results:
+            all_level_tests[pos:pos + len(level_tests)] = level_tests
+            pos += len(level_tests)
+            swing_count += counted
 
         # Calculate statistics
         stats = self._calculate_stats(all_level_tests)
 
+        start_date, end_date = np.datetime_as_string(history.datetimes[[0, -1]], unit="D").tolist()
+
         return BacktestResult(
             symbol=symbol,
             period=f"{period} {period_type}(s)",
-            start_date=candles[0].datetime.strftime("%Y-%m-%d"),
-            end_date=candles[-1].datetime.strftime("%Y-%m-%d"),
-            candle_count=len(candles),
+            start_date=start_date,
+            end_date=end_date,
+            candle_count=len(timestamps),
             swing_count=swing_count,
             total_levels_tested=len(all_level_tests),
             levels=all_level_tests,
             stats=stats
         )
 
-    def _test_level(
+    def _load_history(
         self,
-        level_price: float,
-        level_type: str,
-        candles: List[Candle],
-        is_support: bool,
-        price_range: float
-    ) -> LevelTest:
-        """Test how price respects a specific level"""
-
-        touched = False
-        held = False
-        pierced = False
-        broken = False
-        touch_count = 0
-        first_touch_idx = None
-        max_pierce_pct = 0.0
-
-        pierce_threshold = level_price * (self.pierce_tolerance_pct / 100)
-
-        for i, candle in enumerate(candles):
-            # Check if price touched the level
-            if candle.low <= level_price <= candle.high:
-                touched = True
-                touch_count += 1
-                if first_touch_idx is None:
-                    first_touch_idx = i
-
-                # Check if level held
-                if is_support:
-                    # For support: price should stay above or bounce from level
-                    if candle.close >= level_price:
-                        held = True
-                    else:
-                        pierce_amount = level_price - candle.close
-                        pierce_pct = (pierce_amount / level_price) * 100
-                        max_pierce_pct = max(max_pierce_pct, pierce_pct)
-
-                        if pierce_amount > pierce_threshold:
-                            broken = True
-                        else:
-                            pierced = True
-                else:
-                    # For resistance/targets: check if reached
-                    if candle.high >= level_price:
-                        held = True  # "Held" means target was reached
-
-            # For objectives (not S/R), just check if price reached the level
-            if level_type in ["COP", "OP", "XOP"]:
-                if is_support:
-                    if candle.low <= level_price:
-                        touched = True
-                        held = True
-                        if first_touch_idx is None:
-                            first_touch_idx = i
-                else:
-                    if candle.high >= level_price:
-                        touched = True
-                        held = True
-                        if first_touch_idx is None:
-                            first_touch_idx = i
-
-        return LevelTest(
-            level_type=level_type,
-            price=round(level_price, 2),
-            touched=touched,
-            held=held,
-            pierced=pierced,
-            broken=broken,
-            touch_count=touch_count,
-            first_touch_idx=first_touch_idx,
-            max_pierce_pct=round(max_pierce_pct, 2)
-        )
+        symbol: str,
+        period_type: str,
+        period: int,
+        frequency_type: str
+    ) -> CandleSeries:
+        """Get history as a CandleSeries of column arrays, via the client's cache"""
+        if self.cache_dir:
+            history = self.client.get_history_cached(
+                symbol,
+                period_type=period_type,
+                period=period,
+                frequency_type=frequency_type,
+                cache_dir=self.cache_dir
+            )
+        else:
+            history = self.client.get_history(
+                symbol,
+                period_type=period_type,
+                period=period,
+                frequency_type=frequency_type
+            )
+
+        if not len(history):
+            raise ValueError(f"No data returned for {symbol}")
+
+        return history
 
     def _calculate_stats(self, tests: List[LevelTest]) -> Dict[str, float]:
         """Calculate statistics from level tests"""
 
         stats = {}
 
-        # Group by level type
-        level_types = set(t.level_type for t in tests)
-
-        for lt in level_types:
-            lt_tests = [t for t in tests if t.level_type == lt]
-            total = len(lt_tests)
-
-            if total == 0:
-                continue
-
-            touched = sum(1 for t in lt_tests if t.touched)
-            held = sum(1 for t in lt_tests if t.held)
-            pierced = sum(1 for t in lt_tests if t.pierced)
-            broken = sum(1 for t in lt_tests if t.broken)
-
+        # Single pass: [total, touched, held, pierced, broken] per level type
+        counts = defaultdict(lambda: [0, 0, 0, 0, 0])
+        overall_touched = 0
+        overall_held = 0
+
+        for t in tests:
+            c = counts[t.level_type]
+            c[0] += 1
+            if t.touched:
+                c[1] += 1
+                overall_touched += 1
+                if t.held:
+                    overall_held += 1
+            if t.held:
+                c[2] += 1
+            if t.pierced:
+                c[3] += 1
+            if t.broken:
+                c[4] += 1
+
+        for lt, (total, touched, held, pierced, broken) in counts.items():
             stats[f"{lt}_total"] = total
-            stats[f"{lt}_touched_pct"] = round(touched / total * 100, 1) if total > 0 else 0
+            stats[f"{lt}_touched_pct"] = round(touched / total * 100, 1)
             stats[f"{lt}_held_pct"] = round(held / touched * 100, 1) if touched > 0 else 0
             stats[f"{lt}_pierced_pct"] = round(pierced / touched * 100, 1) if touched > 0 else 0
             stats[f"{lt}_broken_pct"] = round(broken / touched * 100, 1) if touched > 0 else 0
@@ -331,14 +514,9 @@ class DiNapoliBacktester:
         # Overall stats
         total = len(tests)
         if total > 0:
-            stats["overall_touched_pct"] = round(
-                sum(1 for t in tests if t.touched) / total * 100, 1
-            )
-            touched_tests = [t for t in tests if t.touched]
-            if touched_tests:
-                stats["overall_held_pct"] = round(
-                    sum(1 for t in touched_tests if t.held) / len(touched_tests) * 100, 1
-                )
+            stats["overall_touched_pct"] = round(overall_touched / total * 100, 1)
+            if overall_touched:
+                stats["overall_held_pct"] = round(overall_held / overall_touched * 100, 1)
 
         return stats
 
@@ -400,7 +578,11 @@ def save_results_json(result: BacktestResult, filename: str):
         "swing_count": result.swing_count,
         "total_levels_tested": result.total_levels_tested,
         "stats": result.stats,
-        "levels": [asdict(l) for l in result.levels]
+        # Levels keep full precision in memory; round only for the report
+        "levels": [
+            {**asdict(l), "price": round(l.price, 2), "max_pierce_pct": round(l.max_pierce_pct, 2)}
+            for l in result.levels
+        ]
     }
 
     with open(filename, "w") as f:
@@ -10,21 +10,207 @@ Core calculations:
 """
 
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from enum import IntEnum
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 import math
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
-@dataclass
+# Importing numba and loading the native kernels costs about half a second,
+# so they are only brought in once an input is large enough to repay it
+_SWING_KERNEL_MIN = 50_000  # bars
+_FIBNODE_KERNEL_MIN = 1024  # reactions
+# Up to this many fibnodes a broadcast pair mask beats the sorted sweep
+# in _confluence_sweep (measured crossover is between 64 and 100)
+_CONFLUENCE_SCAN_MAX = 64
+# Above this many fibnodes the sorted sweep beats the native O(N^2) pair scan
+_CONFLUENCE_KERNEL_MAX = 256
+# Up to this many candidate pairs (N x M) a full broadcast beats the
+# sorted merge in _pairs_within (measured crossover is about 6400)
+_PAIR_SCAN_MAX = 4096
+
+
+@lru_cache(maxsize=None)
+def _native_kernels():
+    """The dinapoli_kernels module, imported on first use (None without numba)"""
+    try:
+        import dinapoli_kernels
+    except ImportError:  # numba is optional; the NumPy paths are used instead
+        return None
+    return dinapoli_kernels
+
+
+class FibRatio(IntEnum):
+    """Which retracement a Fibnode is; indexes RETRACEMENT_RATIOS"""
+    F3 = 0  # .382
+    F5 = 1  # .618
+
+
+_FIB_RATIOS = tuple(FibRatio)
+_RETRACEMENT_RATIOS = (0.382, 0.618)
+
+
+@dataclass(slots=True)
 class Fibnode:
     """A Fibonacci retracement level (support/resistance)"""
     price: float
-    ratio: float  # 0.382 or 0.618
+    ratio_id: FibRatio  # F3 (.382) or F5 (.618)
     reaction_idx: int  # Index of the reaction point that created this
     reaction_price: float  # Price of the reaction point
     focus_price: float  # Price of the focus number
 
+    @property
+    def ratio(self) -> float:
+        return _RETRACEMENT_RATIOS[self.ratio_id]
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class FibnodeBatch:
+    """
+    All Fibnodes for one market swing as parallel arrays.
+
+    Laid out reaction-major (F3 then F5 for each reaction), matching the
+    order of calculate_fibnodes. Indexing or iterating yields Fibnode
+    objects, so a batch can be used anywhere a List[Fibnode] is expected.
+    """
+    prices: np.ndarray
+    ratio_ids: np.ndarray  # FibRatio values
+    reaction_idx: np.ndarray
+    reaction_prices: np.ndarray
+    focus_price: float
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __getitem__(self, i: int) -> Fibnode:
+        return Fibnode(
+            price=float(self.prices[i]),
+            ratio_id=_FIB_RATIOS[self.ratio_ids[i]],
+            reaction_idx=int(self.reaction_idx[i]),
+            reaction_price=float(self.reaction_prices[i]),
+            focus_price=self.focus_price
+        )
+
+    def __iter__(self) -> Iterator[Fibnode]:
+        return (self[i] for i in range(len(self)))
+
+    def to_fibnodes(self) -> List[Fibnode]:
+        # One tolist() per column instead of a scalar conversion per field
+        focus_price = self.focus_price
+        return [
+            Fibnode(price=p, ratio_id=_FIB_RATIOS[r], reaction_idx=idx, reaction_price=rp, focus_price=focus_price)
+            for p, r, idx, rp in zip(
+                self.prices.tolist(), self.ratio_ids.tolist(),
+                self.reaction_idx.tolist(), self.reaction_prices.tolist()
+            )
+        ]
+
+
+def _fibnode_arrays(
+    fibnodes: Union[List[Fibnode], FibnodeBatch]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(prices, ratio_ids, reaction_idx) arrays, reused as-is from a batch"""
+    if isinstance(fibnodes, FibnodeBatch):
+        return fibnodes.prices, fibnodes.ratio_ids, fibnodes.reaction_idx
+    return (
+        np.array([fn.price for fn in fibnodes]),
+        np.array([fn.ratio_id for fn in fibnodes]),
+        np.array([fn.reaction_idx for fn in fibnodes])
+    )
+
+
+def _pairs_within(
+    left: np.ndarray,
+    right: np.ndarray,
+    tolerance: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every (i, j) with |left[i] - right[j]| <= tolerance, as (i, j, diff)
+    arrays in row-major order.
+
+    right is sorted once; each left price's partners are then one
+    contiguous searchsorted slice, so the cost is O((N + M) log M) plus
+    the matches instead of a full N x M scan.
+    """
+    right_order = np.argsort(right, kind="stable")
+    right_sorted = right[right_order]
+
+    # The bounds are widened by a few ulps and then filtered on the exact
+    # |difference| <= tolerance test, so rounding in p +/- tolerance
+    # cannot drop or add a pair
+    slack = 4 * np.finfo(np.float64).eps * (np.abs(left) + tolerance)
+    lo = np.searchsorted(right_sorted, left - tolerance - slack, side="left")
+    hi = np.searchsorted(right_sorted, left + tolerance + slack, side="right")
+
+    # Expand the [lo, hi) slices into flat candidate pairs
+    counts = hi - lo
+    starts = np.cumsum(counts) - counts
+    i = np.repeat(np.arange(len(left)), counts)
+    j = right_order[np.repeat(lo - starts, counts) + np.arange(counts.sum())]
+
+    diff = np.abs(left[i] - right[j])
+    keep = diff <= tolerance
+    i, j, diff = i[keep], j[keep], diff[keep]
+
+    order = np.lexsort((j, i))
+    return i[order], j[order], diff[order]
+
+
+def _confluence_scan(
+    prices: np.ndarray,
+    ratio_ids: np.ndarray,
+    reaction_idx: np.ndarray,
+    tolerance: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    _confluence_sweep as one broadcast N x N mask (same contract).
+
+    O(N^2) memory and time, but for the handful of fibnodes a backtest
+    produces it is much cheaper than sorting and merging.
+    """
+    price_diff = np.abs(prices[:, None] - prices[None, :])
+
+    # Only the upper triangle (i < j) counts. One .382 and one .618 from
+    # different reactions, within tolerance.
+    pairs = np.triu(ratio_ids[:, None] != ratio_ids[None, :], k=1)
+    pairs &= reaction_idx[:, None] != reaction_idx[None, :]
+    pairs &= price_diff <= tolerance
+
+    first, second = np.nonzero(pairs)
+    return first, second, price_diff[first, second]
 
-@dataclass
+
+def _confluence_sweep(
+    prices: np.ndarray,
+    ratio_ids: np.ndarray,
+    reaction_idx: np.ndarray,
+    tolerance: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Confluence pairs as (i, j, |price difference|) arrays with i < j, in
+    row-major pair order (same contract as dinapoli_kernels._confluence).
+
+    O(N log N) in the number of fibnodes, so it also scales to batches
+    too large for the native all-pairs scan.
+    """
+    # Must be between .382 and .618 (one of each)
+    f3_idx, f5_idx = (np.flatnonzero(ratio_ids == r) for r in (FibRatio.F3, FibRatio.F5))
+    a, b, price_diff = _pairs_within(prices[f3_idx], prices[f5_idx], tolerance)
+    a, b = f3_idx[a], f5_idx[b]
+
+    # Must be from different reactions
+    keep = reaction_idx[a] != reaction_idx[b]
+    a, b, price_diff = a[keep], b[keep], price_diff[keep]
+
+    # Report each pair as (i, j) with i < j, in fibnode order
+    first, second = np.minimum(a, b), np.maximum(a, b)
+    order = np.lexsort((second, first))
+    return first[order], second[order], price_diff[order]
+
+
+@dataclass(slots=True)
 class ObjectivePoint:
     """A Fibonacci expansion target (profit objective)"""
     price: float
@@ -35,7 +221,7 @@ class ObjectivePoint:
     point_c: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Confluence:
     """When two Fibnodes from different reactions align"""
     price_low: float
@@ -45,7 +231,7 @@ class Confluence:
     strength: float  # How close they are (0-1, 1 = exact)
 
 
-@dataclass
+@dataclass(slots=True)
 class Agreement:
     """When a Fibnode and Objective Point align"""
     price_low: float
@@ -55,7 +241,7 @@ class Agreement:
     strength: float
 
 
-@dataclass
+@dataclass(slots=True)
 class SwingPoint:
     """A significant high or low point in price action"""
     price: float
@@ -73,8 +259,14 @@ class DiNapoliCalculator:
     - .618, 1.0, and 1.618 for expansions (Objective Points)
     """
 
-    RETRACEMENT_RATIOS = [0.382, 0.618]
+    RETRACEMENT_RATIOS = list(_RETRACEMENT_RATIOS)  # indexed by FibRatio
+    _RETRACEMENT_RATIOS_ARR = np.array(RETRACEMENT_RATIOS)
+    _RATIO_IDS_ARR = np.array(_FIB_RATIOS, dtype=np.int64)
     EXPANSION_RATIOS = [(0.618, "COP"), (1.0, "OP"), (1.618, "XOP")]
+    # Expansion ratios with the trend direction baked in: up from C, down from C
+    _EXPANSION_UP = tuple(ratio for ratio, _ in EXPANSION_RATIOS)
+    _EXPANSION_DOWN = tuple(-ratio for ratio in _EXPANSION_UP)
+    _EXPANSION_NAMES = tuple(name for _, name in EXPANSION_RATIOS)
 
     def __init__(self, confluence_tolerance_pct: float = 0.5):
         """
@@ -111,31 +303,67 @@ class DiNapoliCalculator:
 
         Where B = Focus Number, A = Reaction point
         """
-        fibnodes = []
-
-        for reaction in reaction_points:
-            a = reaction.price
-            b = focus_price
-
-            for ratio in self.RETRACEMENT_RATIOS:
-                if is_uptrend:
-                    # For uptrend: Focus is high, reactions are lows
-                    # Fibnodes provide SUPPORT below the focus
-                    price = b - ratio * (b - a)
-                else:
-                    # For downtrend: Focus is low, reactions are highs
-                    # Fibnodes provide RESISTANCE above the focus
-                    price = b + ratio * (a - b)
-
-                fibnodes.append(Fibnode(
-                    price=round(price, 4),
-                    ratio=ratio,
-                    reaction_idx=reaction.index,
-                    reaction_price=a,
-                    focus_price=b
-                ))
-
-        return fibnodes
+        return self.calculate_fibnode_batch(focus_price, reaction_points, is_uptrend).to_fibnodes()
+
+    def calculate_fibnode_batch(
+        self,
+        focus_price: float,
+        reaction_points: List[SwingPoint],
+        is_uptrend: bool
+    ) -> FibnodeBatch:
+        """
+        Calculate Fibnodes as a FibnodeBatch of parallel arrays.
+
+        Same levels and order as calculate_fibnodes, computed for every
+        reaction and ratio in one broadcast. Vectorized consumers
+        (find_confluence, find_agreement, the backtester) read the arrays
+        directly instead of pulling .price back out of each Fibnode.
+        """
+        return self.calculate_fibnode_arrays(
+            focus_price,
+            np.array([r.price for r in reaction_points], dtype=np.float64),
+            np.array([r.index for r in reaction_points], dtype=np.int64),
+            is_uptrend
+        )
+
+    def calculate_fibnode_arrays(
+        self,
+        focus_price: float,
+        reaction_prices: np.ndarray,
+        reaction_indices: np.ndarray,
+        is_uptrend: bool
+    ) -> FibnodeBatch:
+        """
+        calculate_fibnode_batch for reactions already held as arrays.
+
+        Args:
+            focus_price: The extreme of the market swing (Focus Number)
+            reaction_prices: Reaction prices, most recent first
+            reaction_indices: Bar index of each reaction
+            is_uptrend: True if we're measuring an up move (the prices
+                        already imply it; kept to match calculate_fibnodes)
+        """
+        ratios = self._RETRACEMENT_RATIOS_ARR
+        a = np.asarray(reaction_prices, dtype=np.float64)
+        b = focus_price
+
+        # The signed delta (A - B) carries the trend: reaction lows below
+        # the focus give SUPPORT under it (uptrend), reaction highs above
+        # it give RESISTANCE over it (downtrend). Same bits as B - r(B - A).
+        kernels = _native_kernels() if len(a) >= _FIBNODE_KERNEL_MIN else None
+        if kernels is not None:
+            prices = kernels._fibnodes(b, a, ratios)
+        else:
+            prices = b + ratios[None, :] * (a[:, None] - b)
+
+        per_reaction = len(ratios)
+        return FibnodeBatch(
+            prices=prices.ravel(),
+            ratio_ids=np.tile(self._RATIO_IDS_ARR, len(a)),
+            reaction_idx=np.repeat(np.asarray(reaction_indices, dtype=np.int64), per_reaction),
+            reaction_prices=np.repeat(a, per_reaction),
+            focus_price=b
+        )
 
     # =========================================================================
     # OBJECTIVE POINT CALCULATIONS
@@ -167,27 +395,22 @@ class DiNapoliCalculator:
             OP  = (B - A) + C
             XOP = 1.618(B - A) + C
         """
-        ops = []
-        ab_distance = abs(point_b - point_a)
-
-        for ratio, name in self.EXPANSION_RATIOS:
-            expansion = ratio * ab_distance
-
-            if is_uptrend:
-                price = point_c + expansion
-            else:
-                price = point_c - expansion
-
-            ops.append(ObjectivePoint(
-                price=round(price, 4),
+        # The signed table is picked once, so the arithmetic itself has no
+        # trend branch. Plain floats: a 3-element array costs more than it saves.
+        signed_ratios = self._EXPANSION_UP if is_uptrend else self._EXPANSION_DOWN
+        swing = abs(point_b - point_a)
+
+        return [
+            ObjectivePoint(
+                price=point_c + signed_ratio * swing,
                 ratio=ratio,
                 name=name,
                 point_a=point_a,
                 point_b=point_b,
                 point_c=point_c
-            ))
-
-        return ops
+            )
+            for signed_ratio, ratio, name in zip(signed_ratios, self._EXPANSION_UP, self._EXPANSION_NAMES)
+        ]
 
     # =========================================================================
     # CONFLUENCE DETECTION
@@ -195,7 +418,7 @@ class DiNapoliCalculator:
 
     def find_confluence(
         self,
-        fibnodes: List[Fibnode],
+        fibnodes: Union[List[Fibnode], FibnodeBatch],
         price_range: float
     ) -> List[Confluence]:
         """
@@ -207,7 +430,7 @@ class DiNapoliCalculator:
         3. "Closeness" depends on volatility and time frame
 
         Args:
-            fibnodes: List of all Fibnodes
+            fibnodes: List of all Fibnodes (or a FibnodeBatch)
             price_range: The price range of the swing (for tolerance calc)
 
         Returns:
@@ -216,30 +439,29 @@ class DiNapoliCalculator:
         confluences = []
         tolerance = price_range * (self.confluence_tolerance_pct / 100)
 
-        # Group fibnodes by reaction
-        for i, fn1 in enumerate(fibnodes):
-            for fn2 in fibnodes[i+1:]:
-                # Must be from different reactions
-                if fn1.reaction_idx == fn2.reaction_idx:
-                    continue
-
-                # Must be between .382 and .618 (one of each)
-                ratios = sorted([fn1.ratio, fn2.ratio])
-                if ratios != [0.382, 0.618]:
-                    continue
-
-                # Check if prices are close enough
-                price_diff = abs(fn1.price - fn2.price)
-                if price_diff <= tolerance:
-                    strength = 1 - (price_diff / tolerance) if tolerance > 0 else 1.0
-
-                    confluences.append(Confluence(
-                        price_low=min(fn1.price, fn2.price),
-                        price_high=max(fn1.price, fn2.price),
-                        fibnode_1=fn1,
-                        fibnode_2=fn2,
-                        strength=round(strength, 3)
-                    ))
+        if len(fibnodes) < 2:
+            return confluences
+
+        prices, ratio_ids, reaction_idx = _fibnode_arrays(fibnodes)
+
+        if len(prices) <= _CONFLUENCE_SCAN_MAX:
+            first, second, price_diff = _confluence_scan(prices, ratio_ids, reaction_idx, tolerance)
+        elif len(prices) <= _CONFLUENCE_KERNEL_MAX and _native_kernels() is not None:
+            first, second, price_diff = _native_kernels()._confluence(prices, ratio_ids, reaction_idx, tolerance)
+        else:
+            first, second, price_diff = _confluence_sweep(prices, ratio_ids, reaction_idx, tolerance)
+
+        for i, j, diff in zip(first.tolist(), second.tolist(), price_diff.tolist()):
+            fn1, fn2 = fibnodes[i], fibnodes[j]
+            strength = 1 - (diff / tolerance) if tolerance > 0 else 1.0
+
+            confluences.append(Confluence(
+                price_low=min(fn1.price, fn2.price),
+                price_high=max(fn1.price, fn2.price),
+                fibnode_1=fn1,
+                fibnode_2=fn2,
+                strength=strength
+            ))
 
         return confluences
 
@@ -249,7 +471,7 @@ class DiNapoliCalculator:
 
     def find_agreement(
         self,
-        fibnodes: List[Fibnode],
+        fibnodes: Union[List[Fibnode], FibnodeBatch],
         objective_points: List[ObjectivePoint],
         price_range: float
     ) -> List[Agreement]:
@@ -257,7 +479,7 @@ class DiNapoliCalculator:
         Find Agreement areas where a Fibnode and Objective Point align.
 
         Args:
-            fibnodes: List of Fibnodes
+            fibnodes: List of Fibnodes (or a FibnodeBatch)
             objective_points: List of Objective Points
             price_range: The price range (for tolerance calculation)
 
@@ -267,19 +489,33 @@ class DiNapoliCalculator:
         agreements = []
         tolerance = price_range * (self.confluence_tolerance_pct / 100)
 
-        for fn in fibnodes:
-            for op in objective_points:
-                price_diff = abs(fn.price - op.price)
-                if price_diff <= tolerance:
-                    strength = 1 - (price_diff / tolerance) if tolerance > 0 else 1.0
-
-                    agreements.append(Agreement(
-                        price_low=min(fn.price, op.price),
-                        price_high=max(fn.price, op.price),
-                        fibnode=fn,
-                        objective_point=op,
-                        strength=round(strength, 3)
-                    ))
+        if not len(fibnodes) or not objective_points:
+            return agreements
+
+        fib_prices = _fibnode_arrays(fibnodes)[0]
+        op_prices = np.array([op.price for op in objective_points])
+
+        # Fibnode/objective pairs within tolerance, in (fibnode, objective) order.
+        # A backtest passes at most 10 fibnodes and 3 objectives, where one
+        # broadcast is cheapest; the merge only pays off for large inputs.
+        if len(fib_prices) * len(op_prices) <= _PAIR_SCAN_MAX:
+            diffs = np.abs(fib_prices[:, None] - op_prices[None, :])
+            first, second = np.nonzero(diffs <= tolerance)
+            price_diff = diffs[first, second]
+        else:
+            first, second, price_diff = _pairs_within(fib_prices, op_prices, tolerance)
+
+        for i, j, diff in zip(first.tolist(), second.tolist(), price_diff.tolist()):
+            fn, op = fibnodes[i], objective_points[j]
+            strength = 1 - (diff / tolerance) if tolerance > 0 else 1.0
+
+            agreements.append(Agreement(
+                price_low=min(fn.price, op.price),
+                price_high=max(fn.price, op.price),
+                fibnode=fn,
+                objective_point=op,
+                strength=strength
+            ))
 
         return agreements
 
@@ -288,53 +524,82 @@ class DiNapoliCalculator:
 # SWING DETECTION
 # =============================================================================
 
+def _strict_extrema(values: np.ndarray, lookback: int, is_high: bool) -> np.ndarray:
+    """
+    Indices where a value is the strict extreme of its +/- lookback window.
+
+    The window max/min is reduced in C over a strided view; requiring the
+    extreme to occur exactly once in the window keeps the "strictly greater
+    (or less) than every neighbor" rule, so ties never produce a swing.
+    """
+    windows = sliding_window_view(values, 2 * lookback + 1)
+    center = values[lookback:len(values) - lookback]
+    extreme = windows.max(axis=1) if is_high else windows.min(axis=1)
+    unique = (windows == extreme[:, None]).sum(axis=1) == 1
+    return np.flatnonzero((center == extreme) & unique) + lookback
+
+
+def find_swing_indices(
+    highs: Sequence[float],
+    lows: Sequence[float],
+    lookback: int = 5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find swing highs and lows as bar-index arrays (no SwingPoint objects).
+
+    Same rule as find_swing_points: a bar is a swing high (low) when its
+    high (low) is strictly above (below) every other bar within lookback.
+
+    Returns:
+        Tuple of ascending int64 index arrays (swing_high_idx, swing_low_idx)
+    """
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+
+    if len(highs) < 2 * lookback + 1:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    kernels = _native_kernels() if len(highs) >= _SWING_KERNEL_MIN else None
+    if kernels is not None:
+        return kernels._find_swings(highs, lows, lookback)
+
+    return (
+        _strict_extrema(highs, lookback, is_high=True),
+        _strict_extrema(lows, lookback, is_high=False)
+    )
+
+
 def find_swing_points(
-    highs: List[float],
-    lows: List[float],
+    highs: Sequence[float],
+    lows: Sequence[float],
     lookback: int = 5
 ) -> Tuple[List[SwingPoint], List[SwingPoint]]:
     """
     Find significant swing highs and lows in price data.
 
     Args:
-        highs: List of high prices
-        lows: List of low prices
+        highs: List (or array) of high prices
+        lows: List (or array) of low prices
         lookback: Number of bars to look back/forward for swing detection
 
     Returns:
-        Tuple of (swing_highs, swing_lows)
+        Tuple of (swing_highs, swing_lows), each sorted by index
     """
-    swing_highs = []
-    swing_lows = []
-
-    for i in range(lookback, len(highs) - lookback):
-        # Check for swing high
-        is_swing_high = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i and highs[j] >= highs[i]:
-                is_swing_high = False
-                break
-
-        if is_swing_high:
-            swing_highs.append(SwingPoint(
-                price=highs[i],
-                index=i,
-                is_high=True
-            ))
-
-        # Check for swing low
-        is_swing_low = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i and lows[j] <= lows[i]:
-                is_swing_low = False
-                break
-
-        if is_swing_low:
-            swing_lows.append(SwingPoint(
-                price=lows[i],
-                index=i,
-                is_high=False
-            ))
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    high_idx, low_idx = find_swing_indices(highs, lows, lookback)
+
+    # SwingPoint objects are only built for the surviving indices, from
+    # native ints/floats rather than per-element NumPy scalar conversions
+    swing_highs = [
+        SwingPoint(price=price, index=i, is_high=True)
+        for i, price in zip(high_idx.tolist(), highs[high_idx].tolist())
+    ]
+    swing_lows = [
+        SwingPoint(price=price, index=i, is_high=False)
+        for i, price in zip(low_idx.tolist(), lows[low_idx].tolist())
+    ]
 
     return swing_highs, swing_lows
 
@@ -346,31 +611,40 @@ def identify_market_swing(
     """
     Identify the current market swing and its reaction points.
 
+    Both lists must be sorted by index ascending, as returned by
+    find_swing_points. Finding the focus is O(1); building the reversed
+    reaction list is one C-level copy of the prefix, so the call is O(N)
+    overall.
+
     Returns:
         Tuple of (focus_point, reaction_points, is_uptrend)
     """
     if not swing_highs or not swing_lows:
         return None, [], True
 
+    # Cheap sanity check of the sorted precondition (skipped under -O)
+    assert swing_highs[0].index <= swing_highs[-1].index, "swing_highs must be sorted by index"
+    assert swing_lows[0].index <= swing_lows[-1].index, "swing_lows must be sorted by index"
+
     # Get most recent high and low
-    latest_high = max(swing_highs, key=lambda x: x.index)
-    latest_low = max(swing_lows, key=lambda x: x.index)
+    latest_high = swing_highs[-1]
+    latest_low = swing_lows[-1]
 
-    # Determine trend based on which came last
+    # Determine trend based on which came last. Reactions are taken in
+    # reverse, so they come out most recent first for DiNapoli's method.
     if latest_high.index > latest_low.index:
         # Uptrend: Focus is the high, reactions are the lows before it
         focus = latest_high
-        reactions = [l for l in swing_lows if l.index < focus.index]
+        reactions = swing_lows[::-1]
         is_uptrend = True
     else:
-        # Downtrend: Focus is the low, reactions are the highs before it
+        # Downtrend: Focus is the low, reactions are the highs before it.
+        # Only the latest high can share the focus bar (an outside bar).
         focus = latest_low
-        reactions = [h for h in swing_highs if h.index < focus.index]
+        end = len(swing_highs) if latest_high.index < focus.index else len(swing_highs) - 1
+        reactions = swing_highs[:end][::-1]
         is_uptrend = False
 
-    # Sort reactions by index (most recent first for DiNapoli's method)
-    reactions.sort(key=lambda x: x.index, reverse=True)
-
     return focus, reactions, is_uptrend
 
 
@@ -398,16 +672,18 @@ if __name__ == "__main__":
     print()
 
     # Calculate Fibnodes
-    fibnodes = calc.calculate_fibnodes(focus, reactions, is_uptrend=True)
+    fibnodes = calc.calculate_fibnode_batch(focus, reactions, is_uptrend=True)
+    min_reaction = fibnodes.reaction_prices.min()
     print("FIBNODES (Support Levels):")
-    for fn in sorted(fibnodes, key=lambda x: x.price, reverse=True):
-        ratio_name = "F3" if fn.ratio == 0.382 else "F5"
-        marker = "*" if fn.reaction_price == min(r.price for r in reactions) else ""
+    for i in np.argsort(-fibnodes.prices, kind="stable"):  # Highest first
+        fn = fibnodes[i]
+        ratio_name = fn.ratio_id.name
+        marker = "*" if fn.reaction_price == min_reaction else ""
         print(f"  {ratio_name}{marker} @ {fn.price:.2f} (from reaction @ {fn.reaction_price})")
     print()
 
     # Find Confluence
-    price_range = focus - min(r.price for r in reactions)
+    price_range = focus - min_reaction
     confluences = calc.find_confluence(fibnodes, price_range)
     if confluences:
         print("CONFLUENCE AREAS:")
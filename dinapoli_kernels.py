@@ -0,0 +1,101 @@
+"""
+Native kernels for the DiNapoli hot paths (requires numba)
+
+dinapoli.py imports this module on first use, once an input is large
+enough to repay loading numba, and only when numba is installed. Each
+kernel takes and returns plain NumPy arrays and applies exactly the
+same rule as its NumPy counterpart, so results are identical either way.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, boundscheck=False)
+def _find_swings(highs, lows, lookback):
+    """
+    Strict swing highs/lows as ascending index arrays.
+
+    A bar is a swing high (low) when its high (low) is strictly above
+    (below) every other bar within lookback, as in find_swing_indices.
+    """
+    n = len(highs)
+    idx_high = np.empty(n, np.int64)
+    idx_low = np.empty(n, np.int64)
+    n_high = 0
+    n_low = 0
+
+    for i in range(lookback, n - lookback):
+        swing_high = True
+        for j in range(i - lookback, i + lookback + 1):
+            if j != i and highs[j] >= highs[i]:
+                swing_high = False
+                break
+        if swing_high:
+            idx_high[n_high] = i
+            n_high += 1
+
+        swing_low = True
+        for j in range(i - lookback, i + lookback + 1):
+            if j != i and lows[j] <= lows[i]:
+                swing_low = False
+                break
+        if swing_low:
+            idx_low[n_low] = i
+            n_low += 1
+
+    return idx_high[:n_high], idx_low[:n_low]
+
+
+@njit(cache=True, boundscheck=False)
+def _fibnodes(focus, reactions, ratios):
+    """
+    Retracement prices focus + r * (reaction - focus), reaction-major.
+
+    Signed deltas cover both trends: reactions below the focus (uptrend)
+    give support under it, reactions above (downtrend) resistance over it.
+    """
+    n_ratios = len(ratios)
+    prices = np.empty(len(reactions) * n_ratios)
+
+    for k in range(len(reactions)):
+        delta = reactions[k] - focus
+        for r in range(n_ratios):
+            prices[k * n_ratios + r] = focus + ratios[r] * delta
+
+    return prices
+
+
+@njit(cache=True, boundscheck=False)
+def _confluence(prices, ratio_ids, reaction_idx, tolerance):
+    """
+    Fibnode pairs (i < j) forming Confluence, in row-major pair order.
+
+    A pair needs one F3 and one F5 from different reactions whose prices
+    are within tolerance. Returns (i, j, |price difference|) arrays.
+    """
+    n = len(prices)
+    max_pairs = n * (n - 1) // 2
+    first = np.empty(max_pairs, np.int64)
+    second = np.empty(max_pairs, np.int64)
+    diffs = np.empty(max_pairs)
+    count = 0
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            if ratio_ids[i] == ratio_ids[j] or reaction_idx[i] == reaction_idx[j]:
+                continue
+            diff = abs(prices[i] - prices[j])
+            if diff <= tolerance:
+                first[count] = i
+                second[count] = j
+                diffs[count] = diff
+                count += 1
+
+    return first[:count], second[:count], diffs[:count]
+
+
+# Compile (or load from cache) all three together on that first import
+_find_swings(np.zeros(11), np.zeros(11), 5)
+_fibnodes(0.0, np.zeros(1), np.zeros(2))
+_confluence(np.zeros(2), np.zeros(2, np.int64), np.arange(2), 0.0)
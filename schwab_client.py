@@ -7,17 +7,66 @@ Configuration:
     Example: export SCHWAB_API_URL=http://localhost:8000
 """
 
+import asyncio
+import copy
+import io
+import json
 import os
+import time
+import zipfile
+from urllib.parse import quote as _url_quote
 import requests
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from typing import Callable, List, Dict, Optional, Any, Iterator, Sequence, Union
+from dataclasses import dataclass, fields
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json parses the same payloads
+    _json_loads = json.loads
+
+try:
+    import pyarrow.json as pa_json
+except ImportError:  # pyarrow is optional; large histories decode via json instead
+    pa_json = None
+
+try:
+    import httpx
+except ImportError:  # httpx is optional; only AsyncSchwabClient needs it
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (enables httpx's HTTP/2 support)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 # Default API URL - override with SCHWAB_API_URL environment variable
 DEFAULT_API_URL = "http://192.168.10.239:8000"
 
+# get_history_cached stores one .npz of CandleSeries columns per request
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "schwab")
+DEFAULT_CACHE_TTL = 12 * 60 * 60  # seconds
+# Bar length per frequency_type (seconds). A cached history is only reused
+# if its last bar had closed when it was written; frequencies not listed
+# here (minute bars) are never cached on disk.
+CACHE_BAR_SECONDS = {"daily": 24 * 60 * 60, "weekly": 7 * 24 * 60 * 60, "monthly": 31 * 24 * 60 * 60}
+
+# History bodies at least this large are parsed straight into columns by
+# pyarrow (when installed) instead of building a dict per candle
+ARROW_MIN_BYTES = 1 << 20
+
+# In-memory reuse windows for fast-changing endpoints (seconds)
+QUOTE_TTL = 5
+AUTH_TTL = 60
+
 
-@dataclass
+@dataclass(slots=True)
 class Candle:
     """OHLCV candle data"""
     timestamp: int  # Unix milliseconds
@@ -32,28 +81,283 @@ class Candle:
         return datetime.fromtimestamp(self.timestamp / 1000)
 
 
+@dataclass(slots=True, frozen=True, eq=False)
+class CandleSeries:
+    """
+    OHLCV history as parallel NumPy arrays (one element per bar).
+
+    Vector code reads the columns directly (e.g. series.high). Indexing
+    with an int still yields a Candle and slicing yields a CandleSeries,
+    so list-style callers keep working.
+    """
+    timestamp: np.ndarray  # int64 Unix milliseconds
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # int64
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "CandleSeries":
+        """Build the columns straight from the API's candle dicts"""
+        n = len(records)
+
+        def column(key: str, dtype) -> np.ndarray:
+            return np.fromiter((c[key] for c in records), dtype=dtype, count=n)
+
+        return cls(
+            timestamp=column("datetime", np.int64),
+            open=column("open", np.float64),
+            high=column("high", np.float64),
+            low=column("low", np.float64),
+            close=column("close", np.float64),
+            volume=column("volume", np.int64)
+        )
+
+    @property
+    def datetimes(self) -> np.ndarray:
+        """Bar times as datetime64[ms] (UTC), converted in one pass"""
+        return self.timestamp.astype("datetime64[ms]")
+
+    def date_strings(self) -> np.ndarray:
+        """Bar dates as 'YYYY-MM-DD' strings (UTC), formatted in one pass"""
+        return np.datetime_as_string(self.datetimes, unit="D")
+
+    @classmethod
+    def from_json(cls, content: bytes) -> "CandleSeries":
+        """Build the columns from a raw /api/history response body"""
+        if pa_json is not None and len(content) >= ARROW_MIN_BYTES:
+            return cls._from_arrow_json(content)
+        return cls.from_records(_json_loads(content).get("candles", []))
+
+    @classmethod
+    def _from_arrow_json(cls, content: bytes) -> "CandleSeries":
+        """Parse the body with pyarrow; candles never exist as Python objects"""
+        # The body is one JSON object that may span lines, so it must be
+        # parsed as a single block
+        table = pa_json.read_json(
+            io.BytesIO(content),
+            read_options=pa_json.ReadOptions(block_size=len(content) + 1),
+            parse_options=pa_json.ParseOptions(newlines_in_values=True)
+        )
+        # Same as the records path: no candles field means no candles
+        if "candles" not in table.schema.names:
+            return cls.from_records([])
+        candles = table.column("candles").combine_chunks().flatten()
+        if not len(candles):
+            return cls.from_records([])
+
+        def column(key: str, dtype) -> np.ndarray:
+            return np.asarray(candles.field(key).to_numpy(zero_copy_only=False), dtype=dtype)
+
+        return cls(
+            timestamp=column("datetime", np.int64),
+            open=column("open", np.float64),
+            high=column("high", np.float64),
+            low=column("low", np.float64),
+            close=column("close", np.float64),
+            volume=column("volume", np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Candle, "CandleSeries"]:
+        if isinstance(i, slice):
+            return CandleSeries(
+                timestamp=self.timestamp[i],
+                open=self.open[i],
+                high=self.high[i],
+                low=self.low[i],
+                close=self.close[i],
+                volume=self.volume[i]
+            )
+        return Candle(
+            timestamp=int(self.timestamp[i]),
+            open=float(self.open[i]),
+            high=float(self.high[i]),
+            low=float(self.low[i]),
+            close=float(self.close[i]),
+            volume=int(self.volume[i])
+        )
+
+    def __iter__(self) -> Iterator[Candle]:
+        return (self[i] for i in range(len(self)))
+
+
+class _TTLCache:
+    """
+    Small in-memory cache whose entries expire ttl seconds after being set.
+
+    Values are stored and handed back as copies, like _ConditionalCache
+    bodies, so a caller mutating a response can't change later hits.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: Dict[Any, tuple] = {}
+
+    def get(self, key: Any) -> Any:
+        """Cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: Any, value: Any, ttl: float) -> None:
+        if len(self._entries) >= self.maxsize and key not in self._entries:
+            # Drop the oldest insertion to stay bounded
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+
+
+class _ConditionalCache:
+    """
+    Last decoded body and its ETag/Last-Modified validators per request.
+
+    Lets _get send If-None-Match / If-Modified-Since, so an unchanged
+    resource comes back as an empty 304 instead of a full body to parse.
+    Bodies are stored and handed back as copies, so a caller mutating a
+    response can't change what later 304s return.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: Dict[tuple, tuple] = {}
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict]) -> tuple:
+        return endpoint, tuple(sorted((params or {}).items()))
+
+    def headers(self, key: tuple) -> Dict[str, str]:
+        """Conditional request headers for a previously seen request"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def body(self, key: tuple) -> Any:
+        """The body a 304 for this request refers to"""
+        return copy.deepcopy(self._entries[key][2])
+
+    def store(self, key: tuple, response_headers, data: Any) -> None:
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        if len(self._entries) >= self.maxsize and key not in self._entries:
+            # Drop the oldest insertion to stay bounded
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (etag, last_modified, copy.deepcopy(data))
+
+
+class _ResponseCache:
+    """
+    Response reuse shared by SchwabClient and AsyncSchwabClient.
+
+    A request made with a ttl is answered from memory for that long; any
+    other repeat request carries the cached ETag/Last-Modified validators.
+    Only the transport differs between the clients, so each _get is
+    recent() -> headers() -> send -> resolve().
+    """
+
+    def __init__(self):
+        self._recent = _TTLCache()
+        self._conditional = _ConditionalCache()
+
+    key = staticmethod(_ConditionalCache.key)
+
+    def recent(self, key: tuple) -> Any:
+        """A response still within its ttl, or None"""
+        return self._recent.get(key)
+
+    def headers(self, key: tuple) -> Dict[str, str]:
+        """Conditional request headers for a previously seen request"""
+        return self._conditional.headers(key)
+
+    def resolve(
+        self,
+        key: tuple,
+        headers: Dict[str, str],
+        response: Any,
+        decode: Callable[[bytes], Any],
+        ttl: Optional[float]
+    ) -> Any:
+        """
+        Decoded body of a requests or httpx response to a request sent
+        with headers, reusing the cached body on a 304.
+        """
+        if response.status_code == 304 and headers:
+            data = self._conditional.body(key)
+        else:
+            response.raise_for_status()
+            data = decode(response.content)
+            self._conditional.store(key, response.headers, data)
+        if ttl is not None:
+            self._recent.set(key, data, ttl)
+        return data
+
+
 class SchwabClient:
     """Client for the Schwab Trading Dashboard API"""
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, max_retries: int = 5):
+        """
+        Args:
+            base_url: API server URL (defaults to SCHWAB_API_URL)
+            max_retries: Retries for a GET that hits a connection error or a
+                         429/5xx, with exponential backoff (0 disables)
+        """
         self.base_url = base_url or os.environ.get("SCHWAB_API_URL", DEFAULT_API_URL)
-        self.base_url = base_url
         self.session = requests.Session()
+        self._cache = _ResponseCache()
 
-    def _get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make GET request to API"""
-        url = f"{self.base_url}{endpoint}"
-        response = self.session.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        # Transient failures are retried here instead of surfacing to the
+        # caller; once retries run out the last response is returned, so
+        # raise_for_status still reports the real HTTP error
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        decode: Callable[[bytes], Any] = _json_loads,
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Make GET request to API (conditional when a validator is cached;
+        answered from memory for ttl seconds when one is given)
+        """
+        key = self._cache.key(endpoint, params)
+        data = self._cache.recent(key)
+        if data is not None:
+            return data
+        headers = self._cache.headers(key)
+        response = self.session.get(f"{self.base_url}{endpoint}", params=params, headers=headers, timeout=30)
+        return self._cache.resolve(key, headers, response, decode, ttl)
 
     def check_auth(self) -> Dict[str, Any]:
-        """Check Schwab authentication status"""
-        return self._get("/api/auth/schwab/status")
+        """Check Schwab authentication status (reused for AUTH_TTL seconds)"""
+        return self._get("/api/auth/schwab/status", ttl=AUTH_TTL)
 
     def get_quote(self, symbol: str) -> Dict[str, Any]:
-        """Get current quote for a symbol"""
-        return self._get(f"/api/quotes/{symbol}")
+        """Get current quote for a symbol (reused for QUOTE_TTL seconds)"""
+        return self._get(f"/api/quotes/{symbol}", ttl=QUOTE_TTL)
 
     def get_history(
         self,
@@ -63,7 +367,7 @@ class SchwabClient:
         frequency_type: str = "daily",
         frequency: int = 1,
         extended_hours: bool = False
-    ) -> List[Candle]:
+    ) -> CandleSeries:
         """
         Get historical price data.
 
@@ -76,55 +380,257 @@ class SchwabClient:
             extended_hours: Include extended hours data
 
         Returns:
-            List of Candle objects
+            CandleSeries of column arrays (index it for Candle objects)
         """
-        params = {
-            "period_type": period_type,
-            "period": period,
-            "frequency_type": frequency_type,
-            "frequency": frequency,
-            "extended_hours": str(extended_hours).lower()
-        }
-
-        data = self._get(f"/api/history/{symbol}", params)
-
-        candles = []
-        for c in data.get("candles", []):
-            candles.append(Candle(
-                timestamp=c["datetime"],
-                open=c["open"],
-                high=c["high"],
-                low=c["low"],
-                close=c["close"],
-                volume=c["volume"]
-            ))
-
-        return candles
+        params = _history_params(period_type, period, frequency_type, frequency, extended_hours)
+        return self._get(f"/api/history/{symbol}", params, decode=CandleSeries.from_json)
+
+    def get_history_cached(
+        self,
+        symbol: str,
+        period_type: str = "month",
+        period: int = 3,
+        frequency_type: str = "daily",
+        frequency: int = 1,
+        extended_hours: bool = False,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_age: Optional[float] = DEFAULT_CACHE_TTL
+    ) -> CandleSeries:
+        """
+        get_history backed by an on-disk cache.
+
+        Each request is stored as one .npz of the CandleSeries columns,
+        named after the server and the full request, and reused until it
+        is older than max_age seconds (None never expires it). An entry
+        whose last bar was still forming when it was written (a daily
+        fetch before the close, say) is always refetched, and intraday
+        frequencies bypass the cache entirely. Empty results are not
+        cached, and a failed cache write only skips caching; the fetched
+        history is still returned.
+        """
+        bar_seconds = CACHE_BAR_SECONDS.get(frequency_type)
+        if bar_seconds is None:
+            # Minute bars change within the session; always fetch them
+            return self.get_history(symbol, period_type, period, frequency_type, frequency, extended_hours)
+
+        # Every part is percent-escaped, so symbols like "BRK/B" and the
+        # server URL stay within a single filename
+        key = "_".join(_url_quote(str(v), safe="") for v in (
+            self.base_url, symbol, period_type, period, frequency_type, frequency,
+            str(extended_hours).lower()
+        ))
+        path = os.path.join(cache_dir, f"{key}.npz")
+
+        try:
+            written = os.path.getmtime(path)
+            if max_age is None or time.time() - written < max_age:
+                with np.load(path) as cached:
+                    history = CandleSeries(**{field: cached[field] for field in _CANDLE_FIELDS})
+                # Reuse only if the last bar was complete when it was saved
+                if written >= history.timestamp[-1] / 1000 + bar_seconds:
+                    return history
+        except (OSError, KeyError, ValueError, IndexError, zipfile.BadZipFile):
+            pass  # Missing, unreadable or stale; refetch below
+
+        history = self.get_history(symbol, period_type, period, frequency_type, frequency, extended_hours)
+
+        if len(history):
+            # Write then rename, so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    np.savez(f, **{field: getattr(history, field) for field in _CANDLE_FIELDS})
+                os.replace(tmp_path, path)
+            except OSError:
+                # Unwritable or full cache: skip caching, keep the result
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+        return history
 
     def get_technicals(self, symbol: str) -> Dict[str, Any]:
         """Get technical indicators for a symbol"""
         return self._get(f"/api/technicals/{symbol}")
 
 
+_CANDLE_FIELDS = tuple(f.name for f in fields(CandleSeries))
+
+
+def _history_params(
+    period_type: str,
+    period: int,
+    frequency_type: str,
+    frequency: int,
+    extended_hours: bool
+) -> Dict[str, Any]:
+    """Query parameters for /api/history, shared by the sync and async clients"""
+    return {
+        "period_type": period_type,
+        "period": period,
+        "frequency_type": frequency_type,
+        "frequency": frequency,
+        "extended_hours": str(extended_hours).lower()
+    }
+
+
+class AsyncSchwabClient:
+    """
+    Async client for the Schwab Trading Dashboard API (requires httpx).
+
+    Independent requests can be issued concurrently over one pooled
+    connection set, e.g.:
+
+        async with AsyncSchwabClient() as client:
+            auth, quote = await asyncio.gather(client.check_auth(), client.get_quote("SPY"))
+    """
+
+    def __init__(self, base_url: str = None, http2: bool = _HTTP2_AVAILABLE):
+        """
+        Args:
+            base_url: API server URL (defaults to SCHWAB_API_URL)
+            http2: Negotiate HTTP/2 where the server supports it
+                   (needs the h2 package: pip install "httpx[http2]")
+        """
+        if httpx is None:
+            raise ImportError('AsyncSchwabClient requires httpx: pip install "httpx[http2]"')
+
+        self.base_url = base_url or os.environ.get("SCHWAB_API_URL", DEFAULT_API_URL)
+        self.client = httpx.AsyncClient(base_url=self.base_url, http2=http2, timeout=30)
+        self._cache = _ResponseCache()
+
+    async def __aenter__(self) -> "AsyncSchwabClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        await self.client.aclose()
+
+    async def _get(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        decode: Callable[[bytes], Any] = _json_loads,
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Make GET request to API (see SchwabClient._get)"""
+        key = self._cache.key(endpoint, params)
+        data = self._cache.recent(key)
+        if data is not None:
+            return data
+        headers = self._cache.headers(key)
+        response = await self.client.get(endpoint, params=params, headers=headers)
+        return self._cache.resolve(key, headers, response, decode, ttl)
+
+    async def check_auth(self) -> Dict[str, Any]:
+        """Check Schwab authentication status (reused for AUTH_TTL seconds)"""
+        return await self._get("/api/auth/schwab/status", ttl=AUTH_TTL)
+
+    async def get_quote(self, symbol: str) -> Dict[str, Any]:
+        """Get current quote for a symbol (reused for QUOTE_TTL seconds)"""
+        return await self._get(f"/api/quotes/{symbol}", ttl=QUOTE_TTL)
+
+    async def get_history(
+        self,
+        symbol: str,
+        period_type: str = "month",
+        period: int = 3,
+        frequency_type: str = "daily",
+        frequency: int = 1,
+        extended_hours: bool = False
+    ) -> CandleSeries:
+        """Get historical price data (see SchwabClient.get_history)"""
+        params = _history_params(period_type, period, frequency_type, frequency, extended_hours)
+        return await self._get(f"/api/history/{symbol}", params, decode=CandleSeries.from_json)
+
+    async def get_history_many(
+        self,
+        symbols: Sequence[str],
+        max_concurrency: int = 8,
+        timeout: Optional[float] = 30,
+        errors: Optional[Dict[str, Exception]] = None,
+        **kwargs
+    ) -> Dict[str, CandleSeries]:
+        """
+        Get history for several symbols concurrently.
+
+        Args:
+            symbols: Stock symbols to fetch
+            max_concurrency: Most requests in flight at once (rate limiting)
+            timeout: Seconds allowed per symbol, not counting time spent
+                     waiting for a free slot (None for no limit)
+            errors: Optional dict that receives symbol -> exception for
+                    each symbol that failed or timed out
+            **kwargs: Passed through to get_history
+
+        Returns:
+            Dict of symbol -> CandleSeries for the symbols that succeeded,
+            in the order given. A failing or slow symbol is left out (and
+            recorded in errors) rather than discarding the others.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(symbol: str) -> CandleSeries:
+            async with semaphore:
+                return await asyncio.wait_for(self.get_history(symbol, **kwargs), timeout)
+
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols), return_exceptions=True)
+
+        histories = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                if errors is not None:
+                    errors[symbol] = result
+            elif isinstance(result, BaseException):
+                raise result  # Cancellation and the like are not per-symbol failures
+            else:
+                histories[symbol] = result
+        return histories
+
+    async def get_technicals(self, symbol: str) -> Dict[str, Any]:
+        """Get technical indicators for a symbol"""
+        return await self._get(f"/api/technicals/{symbol}")
+
+
 # =============================================================================
 # EXAMPLE USAGE
 # =============================================================================
 
+async def _fetch_overview(symbol: str):
+    """Fetch auth status, quote and history concurrently"""
+    async with AsyncSchwabClient() as client:
+        return await asyncio.gather(
+            client.check_auth(),
+            client.get_quote(symbol),
+            client.get_history(symbol, period_type="month", period=1)
+        )
+
+
 if __name__ == "__main__":
-    client = SchwabClient()
+    if httpx is not None:
+        # The three requests are independent: one round trip instead of three
+        auth, quote, candles = asyncio.run(_fetch_overview("SPY"))
+    else:
+        client = SchwabClient()
+        auth = client.check_auth()
+        quote = client.get_quote("SPY")
+        candles = client.get_history("SPY", period_type="month", period=1)
 
     # Check auth
-    auth = client.check_auth()
     print(f"Auth status: {auth.get('authenticated', False)}")
 
     # Get SPY quote
-    quote = client.get_quote("SPY")
     print(f"\nSPY Quote:")
     print(f"  Price: ${quote['quote']['lastPrice']:.2f}")
     print(f"  Change: {quote['quote']['netChange']:+.2f} ({quote['quote']['netPercentChange']:+.2f}%)")
 
     # Get history
-    candles = client.get_history("SPY", period_type="month", period=1)
     print(f"\nSPY History ({len(candles)} candles):")
-    for c in candles[-5:]:
-        print(f"  {c.datetime.strftime('%Y-%m-%d')}: O={c.open:.2f} H={c.high:.2f} L={c.low:.2f} C={c.close:.2f}")
+    recent = candles[-5:]
+    for day, c in zip(recent.date_strings(), recent):
+        print(f"  {day}: O={c.open:.2f} H={c.high:.2f} L={c.low:.2f} C={c.close:.2f}")
@@ -3,9 +3,14 @@ DiNapoli Levels - Concrete Example
 Shows exactly how the levels are calculated step by step
 """
 
+import sys
+
+import numpy as np
+
 from schwab_client import SchwabClient
 from dinapoli import (
     DiNapoliCalculator,
+    FibRatio,
     SwingPoint,
     find_swing_points,
     identify_market_swing
@@ -13,100 +18,118 @@ from dinapoli import (
 
 def run_example(symbol: str = "SPY"):
     """Show a concrete example of DiNapoli level calculation"""
+    lines = []
+    try:
+        _build_example(symbol, lines.append)
+    finally:
+        # One write for the whole report (including whatever was built
+        # before an error) instead of a print and flush per line
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _build_example(symbol: str, out):
+    """Append the report for run_example line by line via out()"""
 
     client = SchwabClient()
     calc = DiNapoliCalculator(confluence_tolerance_pct=0.5)
 
     # Get recent data
-    candles = client.get_history(symbol, period_type="month", period=3, frequency_type="daily")
-
-    print("=" * 70)
-    print(f"DINAPOLI LEVELS - CONCRETE EXAMPLE FOR {symbol}")
-    print("=" * 70)
-    print(f"\nAnalyzing {len(candles)} daily candles")
-    print(f"Date range: {candles[0].datetime.strftime('%Y-%m-%d')} to {candles[-1].datetime.strftime('%Y-%m-%d')}")
-
-    # Extract prices
-    highs = [c.high for c in candles]
-    lows = [c.low for c in candles]
-
-    # Find swing points
-    swing_highs, swing_lows = find_swing_points(highs, lows, lookback=5)
-
-    print(f"\n" + "-" * 70)
-    print("STEP 1: IDENTIFY SWING POINTS (Reaction Numbers)")
-    print("-" * 70)
-    print(f"\nSwing Highs found: {len(swing_highs)}")
+    candles = client.get_history_cached(symbol, period_type="month", period=3, frequency_type="daily")
+    dates = candles.date_strings()  # every bar's date, formatted once
+
+    out("=" * 70)
+    out(f"DINAPOLI LEVELS - CONCRETE EXAMPLE FOR {symbol}")
+    out("=" * 70)
+    out(f"\nAnalyzing {len(candles)} daily candles")
+    out(f"Date range: {dates[0]} to {dates[-1]}")
+
+    # Find swing points (the column arrays feed the vectorized scan directly)
+    swing_highs, swing_lows = find_swing_points(candles.high, candles.low, lookback=5)
+
+    out(f"\n" + "-" * 70)
+    out("STEP 1: IDENTIFY SWING POINTS (Reaction Numbers)")
+    out("-" * 70)
+    out(f"\nSwing Highs found: {len(swing_highs)}")
     for sh in swing_highs[-5:]:  # Last 5
-        print(f"  {candles[sh.index].datetime.strftime('%Y-%m-%d')}: ${sh.price:.2f}")
+        out(f"  {dates[sh.index]}: ${sh.price:.2f}")
 
-    print(f"\nSwing Lows found: {len(swing_lows)}")
+    out(f"\nSwing Lows found: {len(swing_lows)}")
     for sl in swing_lows[-5:]:  # Last 5
-        print(f"  {candles[sl.index].datetime.strftime('%Y-%m-%d')}: ${sl.price:.2f}")
+        out(f"  {dates[sl.index]}: ${sl.price:.2f}")
 
     # Identify current market swing
     focus, reactions, is_uptrend = identify_market_swing(swing_highs, swing_lows)
 
-    print(f"\n" + "-" * 70)
-    print("STEP 2: IDENTIFY MARKET SWING")
-    print("-" * 70)
+    out(f"\n" + "-" * 70)
+    out("STEP 2: IDENTIFY MARKET SWING")
+    out("-" * 70)
     trend_str = "UPTREND" if is_uptrend else "DOWNTREND"
-    print(f"\nCurrent Trend: {trend_str}")
-    print(f"Focus Number (B): ${focus.price:.2f} on {candles[focus.index].datetime.strftime('%Y-%m-%d')}")
-    print(f"\nReaction Points (A values):")
+    out(f"\nCurrent Trend: {trend_str}")
+    out(f"Focus Number (B): ${focus.price:.2f} on {dates[focus.index]}")
+    out(f"\nReaction Points (A values):")
     for i, r in enumerate(reactions[:5]):
         marker = " (*)" if i == 0 else ""  # Primary reaction
-        print(f"  R{i+1}{marker}: ${r.price:.2f} on {candles[r.index].datetime.strftime('%Y-%m-%d')}")
+        out(f"  R{i+1}{marker}: ${r.price:.2f} on {dates[r.index]}")
+
+    # The three most recent reactions feed every step below; pull their
+    # prices and indices into arrays once
+    top_reactions = reactions[:3]
+    top_prices = np.array([r.price for r in top_reactions], dtype=np.float64)
+    top_indices = np.array([r.index for r in top_reactions], dtype=np.int64)
 
     # Calculate Fibnodes
-    print(f"\n" + "-" * 70)
-    print("STEP 3: CALCULATE FIBNODES (Support/Resistance)")
-    print("-" * 70)
-    print("\nUsing DiNapoli's formulas:")
-    print("  F3 = B - 0.382(B - A)")
-    print("  F5 = B - 0.618(B - A)")
-
-    fibnodes = calc.calculate_fibnodes(focus.price, reactions[:3], is_uptrend)
-
-    print(f"\nFibnodes calculated:")
-    for fn in sorted(fibnodes, key=lambda x: x.price, reverse=True):
-        ratio_name = "F3 (.382)" if fn.ratio == 0.382 else "F5 (.618)"
+    out(f"\n" + "-" * 70)
+    out("STEP 3: CALCULATE FIBNODES (Support/Resistance)")
+    out("-" * 70)
+    out("\nUsing DiNapoli's formulas:")
+    out("  F3 = B - 0.382(B - A)")
+    out("  F5 = B - 0.618(B - A)")
+
+    fibnode_batch = calc.calculate_fibnode_arrays(focus.price, top_prices, top_indices, is_uptrend)
+    fibnodes = fibnode_batch.to_fibnodes()
+    # Highest first, sorted once for both listings below
+    fibnodes_by_price = [fibnodes[i] for i in np.argsort(-fibnode_batch.prices, kind="stable")]
+
+    out(f"\nFibnodes calculated:")
+    for fn in fibnodes_by_price:
+        ratio_name = ("F3 (.382)", "F5 (.618)")[fn.ratio_id]
         b = fn.focus_price
         a = fn.reaction_price
 
-        print(f"\n  {ratio_name} from Reaction @ ${a:.2f}:")
-        print(f"    Formula: {b:.2f} - {fn.ratio}*({b:.2f} - {a:.2f})")
-        print(f"    = {b:.2f} - {fn.ratio}*{b-a:.2f}")
-        print(f"    = {b:.2f} - {fn.ratio*(b-a):.2f}")
-        print(f"    = ${fn.price:.2f}")
+        out(f"\n  {ratio_name} from Reaction @ ${a:.2f}:")
+        out(f"    Formula: {b:.2f} - {fn.ratio}*({b:.2f} - {a:.2f})")
+        out(f"    = {b:.2f} - {fn.ratio}*{b-a:.2f}")
+        out(f"    = {b:.2f} - {fn.ratio*(b-a):.2f}")
+        out(f"    = ${fn.price:.2f}")
 
     # Find Confluence
-    print(f"\n" + "-" * 70)
-    print("STEP 4: FIND CONFLUENCE (Aligned Fibnodes)")
-    print("-" * 70)
-    print("\nRule: Confluence occurs when F3 from one reaction aligns with F5 from another")
+    out(f"\n" + "-" * 70)
+    out("STEP 4: FIND CONFLUENCE (Aligned Fibnodes)")
+    out("-" * 70)
+    out("\nRule: Confluence occurs when F3 from one reaction aligns with F5 from another")
 
-    price_range = abs(focus.price - min(r.price for r in reactions[:3]))
+    price_range = abs(focus.price - float(top_prices.min()))
     confluences = calc.find_confluence(fibnodes, price_range)
 
     if confluences:
         for conf in confluences:
-            print(f"\n  CONFLUENCE FOUND!")
-            print(f"    F3 @ ${conf.fibnode_1.price:.2f} (from reaction @ ${conf.fibnode_1.reaction_price:.2f})")
-            print(f"    F5 @ ${conf.fibnode_2.price:.2f} (from reaction @ ${conf.fibnode_2.reaction_price:.2f})")
-            print(f"    Zone: ${conf.price_low:.2f} - ${conf.price_high:.2f}")
-            print(f"    Strength: {conf.strength:.0%}")
+            out(f"\n  CONFLUENCE FOUND!")
+            out(f"    F3 @ ${conf.fibnode_1.price:.2f} (from reaction @ ${conf.fibnode_1.reaction_price:.2f})")
+            out(f"    F5 @ ${conf.fibnode_2.price:.2f} (from reaction @ ${conf.fibnode_2.reaction_price:.2f})")
+            out(f"    Zone: ${conf.price_low:.2f} - ${conf.price_high:.2f}")
+            out(f"    Strength: {conf.strength:.0%}")
     else:
-        print("\n  No Confluence found (fibnodes not close enough)")
+        out("\n  No Confluence found (fibnodes not close enough)")
 
     # Calculate Objective Points
-    print(f"\n" + "-" * 70)
-    print("STEP 5: CALCULATE OBJECTIVE POINTS (Profit Targets)")
-    print("-" * 70)
-    print("\nUsing DiNapoli's formulas (calculated FROM Point C):")
-    print("  COP = 0.618(B - A) + C")
-    print("  OP  = (B - A) + C")
-    print("  XOP = 1.618(B - A) + C")
+    out(f"\n" + "-" * 70)
+    out("STEP 5: CALCULATE OBJECTIVE POINTS (Profit Targets)")
+    out("-" * 70)
+    out("\nUsing DiNapoli's formulas (calculated FROM Point C):")
+    out("  COP = 0.618(B - A) + C")
+    out("  OP  = (B - A) + C")
+    out("  XOP = 1.618(B - A) + C")
 
     # Use the first (primary) reaction as A
     point_a = reactions[0].price
@@ -114,59 +137,58 @@ def run_example(symbol: str = "SPY"):
 
     # Find potential Point C (where price retraced to a Fibnode)
     # For this example, use the .618 Fibnode
-    f5_nodes = [fn for fn in fibnodes if fn.ratio == 0.618]
+    f5_nodes = [fn for fn in fibnodes if fn.ratio_id == FibRatio.F5]
     if f5_nodes:
         point_c = f5_nodes[0].price
     else:
         point_c = point_b - 0.618 * (point_b - point_a)
 
-    print(f"\n  Point A (start of move): ${point_a:.2f}")
-    print(f"  Point B (end of move/Focus): ${point_b:.2f}")
-    print(f"  Point C (retracement entry): ${point_c:.2f}")
+    out(f"\n  Point A (start of move): ${point_a:.2f}")
+    out(f"  Point B (end of move/Focus): ${point_b:.2f}")
+    out(f"  Point C (retracement entry): ${point_c:.2f}")
 
     ops = calc.calculate_objective_points(point_a, point_b, point_c, is_uptrend)
 
-    print(f"\n  AB Distance: ${abs(point_b - point_a):.2f}")
+    ab = abs(point_b - point_a)
+    out(f"\n  AB Distance: ${ab:.2f}")
 
     for op in ops:
-        ab = abs(point_b - point_a)
         expansion = op.ratio * ab
-        print(f"\n  {op.name}:")
-        print(f"    Formula: {op.ratio}*({point_b:.2f} - {point_a:.2f}) + {point_c:.2f}")
-        print(f"    = {op.ratio}*{ab:.2f} + {point_c:.2f}")
-        print(f"    = {expansion:.2f} + {point_c:.2f}")
-        print(f"    = ${op.price:.2f}")
+        out(f"\n  {op.name}:")
+        out(f"    Formula: {op.ratio}*({point_b:.2f} - {point_a:.2f}) + {point_c:.2f}")
+        out(f"    = {op.ratio}*{ab:.2f} + {point_c:.2f}")
+        out(f"    = {expansion:.2f} + {point_c:.2f}")
+        out(f"    = ${op.price:.2f}")
 
     # Summary
-    print(f"\n" + "=" * 70)
-    print("SUMMARY - DINAPOLI LEVELS FOR " + symbol)
-    print("=" * 70)
+    out(f"\n" + "=" * 70)
+    out("SUMMARY - DINAPOLI LEVELS FOR " + symbol)
+    out("=" * 70)
 
     current_price = candles[-1].close
-    print(f"\nCurrent Price: ${current_price:.2f}")
+    out(f"\nCurrent Price: ${current_price:.2f}")
 
-    print(f"\nSUPPORT LEVELS (Fibnodes):")
-    for fn in sorted(fibnodes, key=lambda x: x.price, reverse=True):
-        ratio_name = "F3" if fn.ratio == 0.382 else "F5"
+    out(f"\nSUPPORT LEVELS (Fibnodes):")
+    for fn in fibnodes_by_price:
+        ratio_name = fn.ratio_id.name
         dist = ((current_price - fn.price) / current_price) * 100
-        print(f"  {ratio_name}: ${fn.price:.2f} ({dist:+.1f}% from current)")
+        out(f"  {ratio_name}: ${fn.price:.2f} ({dist:+.1f}% from current)")
 
     if confluences:
-        print(f"\nCONFLUENCE ZONES (Strongest S/R):")
+        out(f"\nCONFLUENCE ZONES (Strongest S/R):")
         for conf in confluences:
             mid = (conf.price_low + conf.price_high) / 2
             dist = ((current_price - mid) / current_price) * 100
-            print(f"  K: ${conf.price_low:.2f} - ${conf.price_high:.2f} ({dist:+.1f}% from current)")
+            out(f"  K: ${conf.price_low:.2f} - ${conf.price_high:.2f} ({dist:+.1f}% from current)")
 
-    print(f"\nPROFIT TARGETS (Objective Points):")
+    out(f"\nPROFIT TARGETS (Objective Points):")
     for op in ops:
         dist = ((op.price - current_price) / current_price) * 100
-        print(f"  {op.name}: ${op.price:.2f} ({dist:+.1f}% from current)")
+        out(f"  {op.name}: ${op.price:.2f} ({dist:+.1f}% from current)")
 
-    print()
+    out("")
 
 
 if __name__ == "__main__":
-    import sys
     symbol = sys.argv[1] if len(sys.argv) > 1 else "SPY"
     run_example(symbol)